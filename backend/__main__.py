@@ -2,7 +2,7 @@
 Entry point for `uv run .`
 Automatically creates virtual environment and starts the A2A Inspector service.
 """
-from a2a_inspector.__main__ import main
+from a2a_inspector.__main__ import cli
 
 if __name__ == "__main__":
-    main()
+    cli()
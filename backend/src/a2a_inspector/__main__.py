@@ -3,19 +3,39 @@ A2A Inspector main module entry point.
 This allows the package to be run directly with: uv run .
 """
 
+import os
 import sys
+from importlib.util import find_spec
 import uvicorn
 
+# Pin the fast event loop and HTTP parser; fall back to the pure-Python
+# implementations where they are unavailable (uvloop does not support Windows).
+# find_spec only locates the packages, Uvicorn imports them when it starts serving.
+LOOP = "uvloop" if find_spec("uvloop") is not None else "asyncio"
+HTTP = "httptools" if find_spec("httptools") is not None else "h11"
+
 
 def main():
-    """Main entry point"""
-    uvicorn.run(
+    """Main entry point (Gunicorn managing Uvicorn workers, see gunicorn_conf.py)"""
+    if sys.platform == "win32" or find_spec("gunicorn") is None:
+        # Gunicorn does not run on Windows, serve with a single Uvicorn process
+        uvicorn.run(
+            "a2a_inspector.main:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=False,
+            log_level="warning",
+            access_log=False,
+            loop=LOOP,
+            http=HTTP,
+        )
+        return
+
+    os.execvp(sys.executable, [
+        sys.executable, "-m", "gunicorn",
+        "--config", "python:a2a_inspector.gunicorn_conf",
         "a2a_inspector.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=False,
-        log_level="info"
-    )
+    ])
 
 def dev():
     """Development mode entry point"""
@@ -24,11 +44,17 @@ def dev():
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="debug"
+        log_level="debug",
+        loop=LOOP,
+        http=HTTP,
     )
 
-if __name__ == "__main__":
+def cli():
+    """Dispatch to dev() when invoked with `dev`, main() otherwise"""
     if len(sys.argv) > 1 and sys.argv[1] == "dev":
         dev()
     else:
-        main()
\ No newline at end of file
+        main()
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for the A2A Inspector production server.
+Used with: gunicorn -c python:a2a_inspector.gunicorn_conf a2a_inspector.main:app
+
+Tune the number of worker processes with the WEB_CONCURRENCY env var
+(defaults to 2 * CPU count + 1).
+"""
+
+import multiprocessing
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+worker_class = "a2a_inspector.workers.InspectorUvicornWorker"
+worker_connections = 1000
+keepalive = 5
+# Must exceed A2AInspectorService.timeout (180s) so slow agents don't get the worker killed
+timeout = 200
+# No per-request access logging in production
+loglevel = "warning"
+accesslog = None
+# Import the app once in the master so workers fork with routes already built
+# (the shared HTTP client is still created per worker by the app lifespan)
+preload_app = True
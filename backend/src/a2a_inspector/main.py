@@ -1,31 +1,83 @@
 """A2A Inspector FastAPI Application"""
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import logging
+import logging.handlers
+import orjson
+import os
+import queue
 import sys
+from typing import Optional
 
 from . import __version__
+from .middleware import FastCORSMiddleware, UnhandledErrorMiddleware
+from .models import BatchInspectRequest, LoadRequest, SendRequest, canonical_url
 from .services import inspector_service
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+# Configure logging: handlers only enqueue records, a background listener
+# thread writes them to stdout so request handlers never block on I/O.
+# Set up by the lifespan, so the thread runs in every forked worker and nothing
+# is queued in processes that never serve requests (e.g. the Gunicorn master)
+_log_handler: Optional[logging.handlers.QueueHandler] = None
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _start_logging() -> None:
+    """Route root logging through a queue, unless the root logger is already configured (like basicConfig)"""
+    global _log_handler, _log_listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    _log_handler = logging.handlers.QueueHandler(log_queue)
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    root.setLevel(logging.INFO)
+    root.addHandler(_log_handler)
+
+
+def _stop_logging() -> None:
+    """Detach the queue handler and flush the remaining records"""
+    global _log_handler, _log_listener
+    if _log_listener is None:
+        return
+    logging.getLogger().removeHandler(_log_handler)
+    _log_listener.stop()
+    _log_handler = _log_listener = None
+
+
 logger = logging.getLogger(__name__)
 
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management"""
     # Startup event
+    _start_logging()
     logger.info("A2A Inspector starting up...")
+    await inspector_service.startup()
     yield
     
     # Shutdown event
     logger.info("A2A Inspector shutting down...")
+    await inspector_service.shutdown()
+    _stop_logging()
 
 # Create FastAPI application - using new lifespan parameter
 app = FastAPI(
@@ -34,12 +86,18 @@ app = FastAPI(
     version=__version__,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+# Unexpected errors become 500 responses here, inside the CORS middleware added below
+app.add_middleware(UnhandledErrorMiddleware)
+
 # CORS middleware
+# Set USE_STARLETTE_CORS=true to fall back to Starlette's stock CORSMiddleware
+USE_STARLETTE_CORS = os.getenv("USE_STARLETTE_CORS", "false").lower() in ("true", "1", "yes")
 app.add_middleware(
-    CORSMiddleware,
+    CORSMiddleware if USE_STARLETTE_CORS else FastCORSMiddleware,
     allow_origins=[
         "http://localhost:3000",
         "http://localhost:3001",
@@ -47,10 +105,30 @@ app.add_middleware(
         "http://127.0.0.1:3001",
     ],
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "if-none-match"],
+    # Let the UI read the card ETag to send back in If-None-Match
+    expose_headers=["ETag"],
+    # Let browsers cache preflight responses for 24h
+    max_age=86400,
 )
 
+# Error handling: HTTPException keeps FastAPI's own handler, unexpected errors go through UnhandledErrorMiddleware
+@app.exception_handler(RequestValidationError)
+async def request_validation_error_handler(request: Request, exc: RequestValidationError):
+    """Invalid request bodies, reported as a single message like the other errors"""
+    messages = []
+    for error in exc.errors():
+        if error["type"] == "json_invalid":
+            # The location is ("body", <character offset>), not a field name
+            reason = error.get("ctx", {}).get("error")
+            messages.append(f"Invalid JSON body: {reason} at position {error['loc'][-1]}" if reason else "Invalid JSON body")
+            continue
+        # Drop the leading "body" from the error location
+        field = ".".join(str(loc) for loc in error["loc"][1:])
+        messages.append(f"{field}: {error['msg']}" if field else error["msg"])
+    return ORJSONResponse(status_code=422, content={"detail": "; ".join(messages)})
+
 @app.get("/")
 async def root():
     return {
@@ -61,7 +139,10 @@ async def root():
         "endpoints": {
             "load_agent": "POST /api/v1/inspector/load",
             "inspect_agent": "POST /api/v1/inspector/inspect",
-            "send_message": "POST /api/v1/inspector/send-message"
+            "load_and_inspect_agent": "POST /api/v1/inspector/load-and-inspect",
+            "inspect_agents": "POST /api/v1/inspector/inspect-batch",
+            "send_message": "POST /api/v1/inspector/send-message",
+            "send_message_stream": "POST /api/v1/inspector/send-message/stream"
         }
     }
 
@@ -73,90 +154,123 @@ async def health_check():
         "version": __version__
     }
 
+def _card_response(request: Request, result) -> Response:
+    """
+    Return an Agent card result with its ETag. These endpoints are POSTs, so a
+    matching If-None-Match is a failed precondition (RFC 9110 13.1.2), not a 304.
+    """
+    etag = result.pop("etag")
+    if request.headers.get("if-none-match") in (etag, "*"):
+        return Response(status_code=412, headers={"ETag": etag})
+    return ORJSONResponse(result, headers={"ETag": etag})
+
 # Main API endpoints
 @app.post("/api/v1/inspector/load")
-async def load_agent(request: Request):
+async def load_agent(body: LoadRequest, request: Request):
     """Load and validate Agent"""
-    try:
-        request_data = await request.json()
-        agent_url = request_data.get('url')
-
-        if not agent_url:
-            raise HTTPException(status_code=400, detail="url is required")
-        
-        # Validate URL format and security
-        validation_error = inspector_service.validate_url(agent_url)
-        if validation_error:
-            raise HTTPException(status_code=400, detail=validation_error)
-        
-        logger.info(f"Loading agent from URL: {agent_url}")
-        result = await inspector_service.load_agent_card(agent_url)
-        
-        if result["success"]:
-            logger.info(f"Agent loaded successfully: {agent_url}")
-            return result
-        else:
-            logger.warning(f"Failed to load agent: {agent_url} - {result['error']}")
-            raise HTTPException(status_code=502, detail=result['error'])
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error loading agent: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    agent_url = body.agent_url
 
+    # Validate URL format and security
+    validation_error = await inspector_service.validate_url(agent_url)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
+    
+    logger.info("Loading agent from URL: %s", agent_url)
+    result = await inspector_service.load_agent_card(agent_url)
+    
+    if result["success"]:
+        logger.info("Agent loaded successfully: %s", agent_url)
+        return _card_response(request, result)
+    else:
+        logger.warning("Failed to load agent: %s - %s", agent_url, result['error'])
+        raise HTTPException(status_code=502, detail=result['error'])
 
+
+# /load-and-inspect replaces calling /load then /inspect: the inspect result carries the card data too
 @app.post("/api/v1/inspector/inspect")
-async def inspect_agent(request: Request):
-    try:
-        request_data = await request.json()
-        agent_url = request_data.get('url')
-        
-        if not agent_url:
-            raise HTTPException(status_code=400, detail="url is required")
-        
-        # Validate URL format and security
-        validation_error = inspector_service.validate_url(agent_url)
-        if validation_error:
-            raise HTTPException(status_code=400, detail=validation_error)
-        
-        logger.info(f"Inspecting agent: {agent_url}")
-        result = await inspector_service.inspect_agent_card(agent_url)
-        
-        if result["success"]:
-            return result
-        else:
-            raise HTTPException(status_code=502, detail=result['error'])
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error inspecting agent: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/api/v1/inspector/load-and-inspect")
+async def inspect_agent(body: LoadRequest, request: Request):
+    agent_url = body.agent_url
+
+    # Validate URL format and security
+    validation_error = await inspector_service.validate_url(agent_url)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
+    
+    logger.info("Inspecting agent: %s", agent_url)
+    result = await inspector_service.inspect_agent_card(agent_url)
+    
+    if result["success"]:
+        return _card_response(request, result)
+    else:
+        raise HTTPException(status_code=502, detail=result['error'])
+
+@app.post("/api/v1/inspector/inspect-batch")
+async def inspect_agents(body: BatchInspectRequest):
+    """Inspect several Agents concurrently, one result per URL in request order"""
+    agent_urls = [canonical_url(url) for url in body.urls]
+
+    # Validate URL format and security; rejected URLs get an error result instead of failing the batch
+    validation_errors = await asyncio.gather(*map(inspector_service.validate_url, agent_urls))
+    allowed_urls = [url for url, error in zip(agent_urls, validation_errors) if not error]
+
+    logger.info("Inspecting %d agents", len(allowed_urls))
+    inspected = iter(await inspector_service.inspect_agent_cards(allowed_urls))
+    results = [
+        {"success": False, "error": error} if error else next(inspected)
+        for error in validation_errors
+    ]
+
+    return {
+        "success": True,
+        "results": results
+    }
 
 @app.post("/api/v1/inspector/send-message")
-async def send_message(request: Request):
-    try:
-        request_data = await request.json()
-        agent_url = request_data.get('url')
-        message_text = request_data.get('message')
-
-        if not agent_url or not message_text:
-            raise HTTPException(status_code=400, detail="url and message are required")
-        
-        # Validate URL format and security
-        validation_error = inspector_service.validate_url(agent_url)
-        if validation_error:
-            raise HTTPException(status_code=400, detail=validation_error)
-        
-        logger.info(f"Sending message to agent: {agent_url}")
-        result = await inspector_service.send_message(agent_url, message_text)
-
-        if result["success"]:
-            return result
-        else:
-            raise HTTPException(status_code=502, detail=result['error'])
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error sending message: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def send_message(body: SendRequest):
+    agent_url = body.agent_url
+    message_text = body.message
+
+    # Validate URL format and security
+    validation_error = await inspector_service.validate_url(agent_url)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
+    
+    logger.info("Sending message to agent: %s", agent_url)
+    result = await inspector_service.send_message(agent_url, message_text)
+
+    if result["success"]:
+        # Rendered directly: the agent response is a pre-serialized orjson.Fragment
+        return ORJSONResponse(result)
+    else:
+        raise HTTPException(status_code=502, detail=result['error'])
+
+@app.post("/api/v1/inspector/send-message/stream")
+async def send_message_stream(body: SendRequest):
+    """Send a message and stream agent responses as NDJSON, one line per chunk"""
+    agent_url = body.agent_url
+    message_text = body.message
+
+    # Validate URL format and security
+    validation_error = await inspector_service.validate_url(agent_url)
+    if validation_error:
+        raise HTTPException(status_code=400, detail=validation_error)
+
+    logger.info("Streaming message to agent: %s", agent_url)
+
+    async def ndjson_stream():
+        # Every line has the /send-message envelope: {"success": true, "data": ...} or {"success": false, "error": ...}
+        try:
+            async for chunk in inspector_service.stream_message(agent_url, message_text):
+                yield orjson.dumps({"success": True, "data": orjson.Fragment(chunk)}) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error("Error streaming message: %s", e)
+            yield orjson.dumps({"success": False, "error": str(e)}) + b"\n"
+
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        # Stop nginx (docker/nginx.conf) from buffering the stream until it ends
+        headers={"X-Accel-Buffering": "no"},
+    )
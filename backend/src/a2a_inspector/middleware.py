@@ -0,0 +1,170 @@
+"""A2A Inspector ASGI middleware"""
+
+import logging
+from typing import Sequence
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Request headers browsers may always send without being explicitly allowed
+SAFELISTED_HEADERS = frozenset(("accept", "accept-language", "content-language", "content-type"))
+
+
+class FastCORSMiddleware:
+    """
+    Lightweight CORS middleware for a fixed set of origins.
+    All response header values are computed once at startup; per request the
+    origin is checked against a frozenset and the prebuilt headers are attached.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Sequence[str] = (),
+        allow_methods: Sequence[str] = ("GET",),
+        allow_headers: Sequence[str] = (),
+        allow_credentials: bool = False,
+        expose_headers: Sequence[str] = (),
+        max_age: int = 600,
+    ) -> None:
+        self.app = app
+        self._origins_set = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self._methods_set = frozenset(method.upper().encode("latin-1") for method in allow_methods)
+        self._headers_set = SAFELISTED_HEADERS | {header.lower() for header in allow_headers}
+
+        self._allow_methods_hdr = ", ".join(method.upper() for method in allow_methods).encode("latin-1")
+        self._allow_headers_hdr = ", ".join(sorted(self._headers_set)).encode("latin-1")
+        self._max_age_hdr = str(max_age).encode("latin-1")
+        self._vary_hdr = b"Origin"
+        self._preflight_vary_hdr = b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers"
+
+        # Headers added to every CORS response besides Access-Control-Allow-Origin
+        credentials_headers = [(b"access-control-allow-credentials", b"true")] if allow_credentials else []
+        self._simple_headers = list(credentials_headers)
+        if expose_headers:
+            self._simple_headers.append(
+                (b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1"))
+            )
+        self._preflight_headers = credentials_headers + [
+            (b"access-control-allow-methods", self._allow_methods_hdr),
+            (b"access-control-allow-headers", self._allow_headers_hdr),
+            (b"access-control-max-age", self._max_age_hdr),
+            (b"vary", self._preflight_vary_hdr),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, request_method, request_headers, send)
+            return
+
+        allowed = origin in self._origins_set
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                if allowed:
+                    headers.append((b"access-control-allow-origin", origin))
+                    headers.extend(self._simple_headers)
+                # The response depends on Origin even when it is not allowed, so caches must key on it
+                for i, (name, value) in enumerate(headers):
+                    if name == b"vary":
+                        headers[i] = (name, value + b", " + self._vary_hdr)
+                        break
+                else:
+                    headers.append((b"vary", self._vary_hdr))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, origin: bytes, request_method: bytes, request_headers, send: Send) -> None:
+        """Answer a CORS preflight request without reaching the application"""
+        failures = []
+        if origin not in self._origins_set:
+            failures.append("origin")
+        if request_method not in self._methods_set:
+            failures.append("method")
+        if request_headers and not self._headers_allowed(request_headers):
+            failures.append("headers")
+
+        if failures:
+            body = ("Disallowed CORS " + ", ".join(failures)).encode("latin-1")
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"vary", self._preflight_vary_hdr),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 204,
+            "headers": [(b"access-control-allow-origin", origin)] + self._preflight_headers,
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    def _headers_allowed(self, request_headers: bytes) -> bool:
+        """Check the comma-separated Access-Control-Request-Headers value"""
+        for header in request_headers.decode("latin-1").split(","):
+            header = header.strip().lower()
+            if header and header not in self._headers_set:
+                return False
+        return True
+
+
+class UnhandledErrorMiddleware:
+    """
+    Turn unexpected exceptions into a JSON 500 response.
+    Starlette's own catch-all handler runs outside every user middleware, so its
+    responses would miss the CORS headers; add this one inside the CORS middleware.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as exc:
+            if response_started:
+                # Too late to send an error response, let the server close the connection
+                raise
+            logger.exception("Error handling %s: %s", scope["path"], exc)
+            response = JSONResponse(status_code=500, content={"detail": str(exc)})
+            await response(scope, receive, send)
@@ -0,0 +1,35 @@
+"""A2A Inspector API request models"""
+
+from typing import List
+
+from pydantic import BaseModel, Field, HttpUrl
+
+
+def canonical_url(url: HttpUrl) -> str:
+    """
+    Canonical form of a validated agent URL, used as the cache key.
+    Pydantic already lowercases the scheme and host, drops default ports and
+    adds the root path; the fragment is never sent to the agent so it is dropped.
+    """
+    if url.fragment is None:
+        return str(url)
+    return str(url).partition("#")[0]
+
+
+class LoadRequest(BaseModel):
+    """Request body for endpoints that target an agent"""
+    url: HttpUrl
+
+    @property
+    def agent_url(self) -> str:
+        return canonical_url(self.url)
+
+
+class SendRequest(LoadRequest):
+    """Request body for sending a message to an agent"""
+    message: str = Field(min_length=1)
+
+
+class BatchInspectRequest(BaseModel):
+    """Request body for inspecting several agents at once"""
+    urls: List[HttpUrl] = Field(min_length=1, max_length=100)
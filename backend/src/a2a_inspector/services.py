@@ -1,19 +1,34 @@
 """A2A Inspector Service Layer"""
 
+import asyncio
+import hashlib
 import ipaddress
 import logging
 import os
 import socket
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 from urllib.parse import urlparse
 import httpx
+import orjson
 from uuid import uuid4
 
+from cachetools import TTLCache
+
+try:
+    import pytricia
+except ImportError:
+    pytricia = None
+
 from a2a.client import A2ACardResolver, A2AClient
 from a2a.types import (
+    AgentCard,
+    Message,
     MessageSendParams,
+    Part,
+    Role,
     SendMessageRequest,
     SendStreamingMessageRequest,
+    TextPart,
 )
 
 logger = logging.getLogger(__name__)
@@ -22,6 +37,9 @@ logger = logging.getLogger(__name__)
 # Set via ALLOW_LOCAL_NETWORK env var (useful when running inside Docker).
 ALLOW_LOCAL_NETWORK = os.getenv("ALLOW_LOCAL_NETWORK", "false").lower() in ("true", "1", "yes")
 
+# Maximum number of Agent cards fetched at once by inspect_agent_cards
+INSPECT_CONCURRENCY = 16
+
 # Blocked IP ranges for SSRF protection
 BLOCKED_IP_RANGES = [
     ipaddress.ip_network('127.0.0.0/8'),      # Loopback
@@ -37,6 +55,81 @@ BLOCKED_IP_RANGES = [
     ipaddress.ip_network('fe80::/10'),        # IPv6 link-local
 ]
 
+# Blocked ranges split by IP version, so an address is only checked against its own family
+_BLOCKED_V4 = tuple(n for n in BLOCKED_IP_RANGES if n.version == 4)
+_BLOCKED_V6 = tuple(n for n in BLOCKED_IP_RANGES if n.version == 6)
+
+# Radix tries of the blocked ranges when the optional pytricia package is installed.
+# pytricia matches prefix bits without checking the address family, so IPv4 and
+# IPv6 ranges need separate tries or IPv4 prefixes would also match IPv6 addresses.
+_BLOCKED_TRIES = None
+if pytricia is not None:
+    _BLOCKED_TRIES = {4: pytricia.PyTricia(32), 6: pytricia.PyTricia(128)}
+    for _blocked_range in BLOCKED_IP_RANGES:
+        _BLOCKED_TRIES[_blocked_range.version][str(_blocked_range)] = True
+
+
+def _scan_blocked_ranges(ip: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> bool:
+    """Pure-Python check of an IP address against the blocked ranges of its version"""
+    blocked_ranges = _BLOCKED_V4 if ip.version == 4 else _BLOCKED_V6
+    return any(ip in blocked_range for blocked_range in blocked_ranges)
+
+
+def _is_blocked_ip(ip: Union[ipaddress.IPv4Address, ipaddress.IPv6Address]) -> bool:
+    """Check whether an IP address falls into one of the BLOCKED_IP_RANGES"""
+    # IPv4-mapped IPv6 addresses (::ffff:a.b.c.d) reach the IPv4 host, check them as IPv4
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    if _BLOCKED_TRIES is not None:
+        return ip.packed in _BLOCKED_TRIES[ip.version]
+    return _scan_blocked_ranges(ip)
+
+
+# Agent card validation
+_REQUIRED_FIELDS = ('name', 'version', 'capabilities', 'url')
+_MSG_REQUIRED_PRESENT = {field: f"✓ Required field '{field}' is present" for field in _REQUIRED_FIELDS}
+_MSG_REQUIRED_MISSING = {field: f"✗ Missing required field: {field}" for field in _REQUIRED_FIELDS}
+_MSG_CAPS_OK = "✓ Capabilities structure is valid"
+_MSG_CAPS_BAD = "✗ Capabilities must be an object"
+_MSG_STREAM_OK = "✓ Streaming capability supported"
+_MSG_STREAM_NO = "⚠ Streaming capability not supported"
+_MSG_PUSH_OK = "✓ Push notifications supported"
+_MSG_PUSH_NO = "⚠ Push notifications not supported"
+_MSG_SKILLS_BAD = "✗ Skills must be an array"
+_MSG_SKILLS_EMPTY = "⚠ No skills defined"
+_MSG_DONE = "✓ Agent card validation completed"
+# Distinguishes an absent key from one explicitly set to None
+_MISSING = object()
+
+_ROLE_USER = Role.user
+
+def _card_etag(card_data: Dict[str, Any]) -> str:
+    """ETag identifying an Agent card version"""
+    digest = hashlib.blake2b(orjson.dumps(card_data, option=orjson.OPT_SORT_KEYS), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+T = TypeVar("T")
+
+
+async def _single_flight(inflight: Dict[str, asyncio.Future], key: str, fetch: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run fetch() once for all concurrent callers asking for the same key.
+    Every waiter gets the same result or the same exception; a cancelled waiter
+    does not cancel the shared fetch.
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+
+        def _forget(done: asyncio.Future) -> None:
+            if inflight.get(key) is done:
+                del inflight[key]
+
+        task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
 
 class A2AInspectorService:
     """A2A Agent Inspector Service"""
@@ -44,8 +137,37 @@ class A2AInspectorService:
     def __init__(self):
         # timeout for http requests
         self.timeout = 180.0
-
-    def validate_url(self, url: str) -> Optional[str]:
+        # shared client, opened in startup() and closed in shutdown()
+        self.httpx_client: Optional[httpx.AsyncClient] = None
+        # resolved agent cards keyed by agent URL
+        self._card_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+        # in-flight card fetches keyed by agent URL, shared by concurrent cache misses
+        self._card_fetches: Dict[str, asyncio.Future] = {}
+        # A2A clients keyed by agent URL, with the card they were built from and its streaming support
+        self._client_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+        # dumped card data, validation results and ETag keyed by agent URL, with the card they came from
+        self._inspection_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+        # resolved IP addresses keyed by hostname
+        self._dns_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+        # in-flight DNS lookups keyed by hostname
+        self._dns_lookups: Dict[str, asyncio.Future] = {}
+
+    async def startup(self) -> None:
+        """Open the shared HTTP client so connections to agents are pooled and kept alive"""
+        self.httpx_client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+            http2=True,
+        )
+
+    async def shutdown(self) -> None:
+        """Close the shared HTTP client and drop clients bound to it"""
+        self._client_cache.clear()
+        if self.httpx_client is not None:
+            await self.httpx_client.aclose()
+            self.httpx_client = None
+
+    async def validate_url(self, url: str) -> Optional[str]:
         """
         Validate URL format and check for SSRF vulnerabilities.
         Returns an error message if invalid, None if valid.
@@ -74,30 +196,91 @@ class A2AInspectorService:
         hostname = parsed.hostname.lower()
 
         # Block localhost variations
-        if hostname in ('localhost', 'localhost.localdomain'):
+        if hostname in ('localhost', 'localhost.localdomain') or hostname.endswith('.localhost'):
             return "Access to localhost is not allowed"
 
+        # Block mDNS / link-local names, they never resolve to public addresses
+        if hostname.endswith('.local'):
+            return "Access to local network hostnames is not allowed"
+
+        # IP literals can be checked directly without a DNS lookup
+        try:
+            ip = ipaddress.ip_address(hostname)
+        except ValueError:
+            pass
+        else:
+            if _is_blocked_ip(ip):
+                return "Access to private/internal IP addresses is not allowed"
+            return None
+
         # Resolve hostname and check against blocked ranges
         try:
             # Get all IP addresses for the hostname
-            addr_info = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
-            for family, _, _, _, sockaddr in addr_info:
-                ip_str = sockaddr[0]
+            for ip_str in await self._resolve_hostname(hostname):
                 try:
                     ip = ipaddress.ip_address(ip_str)
-                    for blocked_range in BLOCKED_IP_RANGES:
-                        if ip in blocked_range:
-                            return f"Access to private/internal IP addresses is not allowed"
                 except ValueError:
                     continue
+                if _is_blocked_ip(ip):
+                    return "Access to private/internal IP addresses is not allowed"
         except socket.gaierror:
             return f"Unable to resolve hostname: {hostname}"
         except Exception as e:
-            logger.warning(f"Error validating URL {url}: {e}")
+            logger.warning("Error validating URL %s: %s", url, e)
             return "Error validating URL"
 
         return None
 
+    async def _resolve_hostname(self, hostname: str) -> Tuple[str, ...]:
+        """Resolve hostname to IP addresses without blocking the event loop (cached)"""
+        addresses = self._dns_cache.get(hostname)
+        if addresses is not None:
+            return addresses
+
+        return await _single_flight(self._dns_lookups, hostname, lambda: self._lookup_hostname(hostname))
+
+    async def _lookup_hostname(self, hostname: str) -> Tuple[str, ...]:
+        """Resolve hostname with getaddrinfo and cache the addresses"""
+        addr_info = await asyncio.get_running_loop().getaddrinfo(
+            hostname, None, family=socket.AF_UNSPEC, type=socket.SOCK_STREAM
+        )
+        addresses = tuple(sockaddr[0] for _, _, _, _, sockaddr in addr_info)
+        self._dns_cache[hostname] = addresses
+        return addresses
+
+    async def get_agent_card(self, agent_url: str) -> AgentCard:
+        """Resolve an Agent card, served from the TTL cache when possible"""
+        card = self._card_cache.get(agent_url)
+        if card is not None:
+            return card
+
+        # Concurrent misses share one fetch, including its failure
+        return await _single_flight(self._card_fetches, agent_url, lambda: self._fetch_agent_card(agent_url))
+
+    async def _fetch_agent_card(self, agent_url: str) -> AgentCard:
+        """Fetch an Agent card from the agent and cache it"""
+        resolver = A2ACardResolver(
+            httpx_client=self.httpx_client,
+            base_url=agent_url,
+        )
+        card = await resolver.get_agent_card()
+        self._card_cache[agent_url] = card
+        return card
+
+    async def _get_client(self, agent_url: str) -> Tuple[A2AClient, bool]:
+        """Get the A2A client for an agent and whether it supports streaming"""
+        card = await self.get_agent_card(agent_url)
+
+        # Reuse the client as long as it was built from the currently cached card
+        cached = self._client_cache.get(agent_url)
+        if cached is not None and cached[1] is card:
+            return cached[0], cached[2]
+
+        client = A2AClient(httpx_client=self.httpx_client, agent_card=card)
+        supports_streaming = self._supports_streaming(card)
+        self._client_cache[agent_url] = (client, card, supports_streaming)
+        return client, supports_streaming
+
     async def load_agent_card(self, agent_url: str) -> Dict[str, Any]:
         """Load Agent card information"""
         if not agent_url:
@@ -107,21 +290,17 @@ class A2AInspectorService:
             }
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as httpx_client:
-                resolver = A2ACardResolver(
-                    httpx_client=httpx_client,
-                    base_url=agent_url,
-                )
-                card = await resolver.get_agent_card()
-                card_data = card.model_dump(exclude_none=False)
+            card = await self.get_agent_card(agent_url)
+            card_data, _, etag = self._inspect(agent_url, card)
 
             return {
                 "success": True,
                 "data": card_data,
-                "message": "Agent card loaded successfully"
+                "message": "Agent card loaded successfully",
+                "etag": etag,
             }
         except Exception as e:
-            logger.error(f'Failed to load agent card from {agent_url}: {e}')
+            logger.error('Failed to load agent card from %s: %s', agent_url, e)
             return {
                 "success": False,
                 "error": str(e)
@@ -129,136 +308,194 @@ class A2AInspectorService:
 
     async def inspect_agent_card(self, agent_url: str) -> Dict[str, Any]:
         """Inspect Agent card"""
-        result = await self.load_agent_card(agent_url)
-        if result["success"]:
-            return self._validate_agent_card(result["data"])
-        else:
+        if not agent_url:
+            return {
+                "success": False,
+                "error": "Agent URL is required"
+            }
+
+        try:
+            card = await self.get_agent_card(agent_url)
+            card_data, validation_results, etag = self._inspect(agent_url, card)
+        except Exception as e:
+            logger.error('Failed to load agent card from %s: %s', agent_url, e)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+        result = self._validation_response(card_data, validation_results)
+        result["etag"] = etag
+        return result
+
+    async def inspect_agent_cards(self, agent_urls: List[str]) -> List[Dict[str, Any]]:
+        """Inspect several Agent cards concurrently, returning results in input order"""
+        semaphore = asyncio.Semaphore(INSPECT_CONCURRENCY)
+
+        async def inspect_one(agent_url: str) -> Dict[str, Any]:
+            async with semaphore:
+                result = await self.inspect_agent_card(agent_url)
+            # Batch responses carry no ETag header
+            result.pop("etag", None)
             return result
 
+        # inspect_agent_card reports failures in its result, so one bad agent can't fail the batch
+        return await asyncio.gather(*(inspect_one(agent_url) for agent_url in agent_urls))
+
+    def _inspect(self, agent_url: str, card: AgentCard) -> Tuple[Dict[str, Any], List[str], str]:
+        """Dump, validate and compute the ETag of a card, once per cached card"""
+        cached = self._inspection_cache.get(agent_url)
+        if cached is not None and cached[0] is card:
+            return cached[1], cached[2], cached[3]
+
+        card_data = card.model_dump(exclude_none=False)
+        validation_results = self._check_agent_card(card_data)
+        etag = _card_etag(card_data)
+        self._inspection_cache[agent_url] = (card, card_data, validation_results, etag)
+        return card_data, validation_results, etag
+
     def _validate_agent_card(self, card_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate Agent card"""
-        validation_results = []
+        return self._validation_response(card_data, self._check_agent_card(card_data))
 
-        # Check required fields
-        required_fields = ['name', 'version', 'capabilities', 'url']
-        for field in required_fields:
-            if field not in card_data or not card_data[field]:
-                validation_results.append(f"✗ Missing required field: {field}")
-            else:
-                validation_results.append(f"✓ Required field '{field}' is present")
+    def _validation_response(self, card_data: Dict[str, Any], validation_results: List[str]) -> Dict[str, Any]:
+        """Build the inspect result for a validated Agent card"""
+        return {
+            "success": True,
+            "data": card_data,
+            "validation": validation_results,
+            "message": "Agent card validated successfully"
+        }
+
+    def _check_agent_card(self, card_data: Dict[str, Any]) -> List[str]:
+        """Run the Agent card checks, returning one message per check"""
+        # Check required fields (kept in _REQUIRED_FIELDS order)
+        validation_results = [
+            _MSG_REQUIRED_PRESENT[field] if card_data.get(field) else _MSG_REQUIRED_MISSING[field]
+            for field in _REQUIRED_FIELDS
+        ]
 
         # Check capabilities
-        if 'capabilities' in card_data:
-            capabilities = card_data['capabilities']
+        capabilities = card_data.get('capabilities', _MISSING)
+        if capabilities is not _MISSING:
             if isinstance(capabilities, dict):
-                validation_results.append("✓ Capabilities structure is valid")
-
-                # Check A2A key capabilities
-                if capabilities.get('streaming'):
-                    validation_results.append("✓ Streaming capability supported")
-                else:
-                    validation_results.append("⚠ Streaming capability not supported")
-
-                if capabilities.get('pushNotifications'):
-                    validation_results.append("✓ Push notifications supported")
-                else:
-                    validation_results.append("⚠ Push notifications not supported")
+                # Structure check plus the A2A key capabilities, added in one extend
+                validation_results.extend((
+                    _MSG_CAPS_OK,
+                    _MSG_STREAM_OK if capabilities.get('streaming') else _MSG_STREAM_NO,
+                    _MSG_PUSH_OK if capabilities.get('pushNotifications') else _MSG_PUSH_NO,
+                ))
             else:
-                validation_results.append("✗ Capabilities must be an object")
+                validation_results.append(_MSG_CAPS_BAD)
 
         # Check skills
-        if 'skills' in card_data:
-            skills = card_data['skills']
+        skills = card_data.get('skills', _MISSING)
+        if skills is not _MISSING:
             if isinstance(skills, list):
                 if skills:
                     validation_results.append(f"✓ Agent has {len(skills)} skills defined")
                 else:
-                    validation_results.append("⚠ No skills defined")
+                    validation_results.append(_MSG_SKILLS_EMPTY)
             else:
-                validation_results.append("✗ Skills must be an array")
-
-        validation_results.append("✓ Agent card validation completed")
-        return {
-            "success": True,
-            "data": card_data,
-            "validation": validation_results,
-            "message": "Agent card validated successfully"
-        }
+                validation_results.append(_MSG_SKILLS_BAD)
+
+        validation_results.append(_MSG_DONE)
+        return validation_results
+
+    def _build_message_params(self, message_text: str) -> MessageSendParams:
+        """Build message payload for a user text message"""
+        # Built from typed models so pydantic skips re-validating nested dicts
+        message = Message(
+            role=_ROLE_USER,
+            parts=[Part(root=TextPart(text=str(message_text)))],
+            message_id=uuid4().hex,
+        )
+        return MessageSendParams(message=message)
+
+    def _supports_streaming(self, card: AgentCard) -> bool:
+        """Check if agent supports streaming"""
+        # capabilities is a required AgentCard field; streaming is Optional[bool]
+        return getattr(card.capabilities, 'streaming', False) is True
 
     async def send_message(self, agent_url: str, message_text: str) -> Dict[str, Any]:
-        """Send a message to an A2A agent"""
+        """
+        Send a message to an A2A agent.
+        The agent response is serialized by pydantic-core straight to JSON and
+        returned as an orjson.Fragment, so it must be rendered with orjson.
+        """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as httpx_client:
-                # Get agent card using resolver
-                resolver = A2ACardResolver(
-                    httpx_client=httpx_client,
-                    base_url=agent_url,
-                )
-                card = await resolver.get_agent_card()
-                
-                # Create client with the card
-                client = A2AClient(httpx_client=httpx_client, agent_card=card)
-
-                # Build message payload
-                send_message_payload: Dict[str, Any] = {
-                    'message': {
-                        'role': 'user',
-                        'parts': [{'kind': 'text', 'text': str(message_text)}],
-                        'message_id': uuid4().hex,
-                    },
-                }
-
-                # Check if agent supports streaming
-                supports_streaming = (
-                    hasattr(card, 'capabilities')
-                    and card.capabilities is not None
-                    and getattr(card.capabilities, 'streaming', False)
+            # Get client for the agent (cached)
+            client, supports_streaming = await self._get_client(agent_url)
+            params = self._build_message_params(message_text)
+            # JSON-RPC request id, distinct from the message_id inside params
+            request_id = uuid4().hex
+
+            if supports_streaming:
+                # Use streaming endpoint
+                streaming_request = SendStreamingMessageRequest(
+                    id=request_id,
+                    params=params
                 )
+                stream_response = client.send_message_streaming(streaming_request)
 
-                if supports_streaming:
-                    # Use streaming endpoint
-                    streaming_request = SendStreamingMessageRequest(
-                        id=str(uuid4()),
-                        params=MessageSendParams(**send_message_payload)
-                    )
-                    stream_response = client.send_message_streaming(streaming_request)
-
-                    response_data = None
-                    async for chunk in stream_response:
-                        response_data = chunk.model_dump(mode='json', exclude_none=True)
-
-                    if response_data:
-                        return {
-                            "success": True,
-                            "data": response_data,
-                            "message": "Message sent successfully (streaming)"
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": "No response received from streaming"
-                        }
-                else:
-                    # Use non-streaming endpoint
-                    request = SendMessageRequest(
-                        id=str(uuid4()),
-                        params=MessageSendParams(**send_message_payload)
-                    )
-                    response = await client.send_message(request)
-                    response_data = response.model_dump(mode='json', exclude_none=True)
+                # Only the final chunk is returned, so dump it once after the stream ends
+                last_chunk = None
+                async for chunk in stream_response:
+                    last_chunk = chunk
 
+                if last_chunk is not None:
                     return {
                         "success": True,
-                        "data": response_data,
-                        "message": "Message sent successfully"
+                        "data": orjson.Fragment(last_chunk.model_dump_json(exclude_none=True)),
+                        "message": "Message sent successfully (streaming)"
                     }
+                else:
+                    return {
+                        "success": False,
+                        "error": "No response received from streaming"
+                    }
+            else:
+                # Use non-streaming endpoint
+                request = SendMessageRequest(
+                    id=request_id,
+                    params=params
+                )
+                response = await client.send_message(request)
+
+                return {
+                    "success": True,
+                    "data": orjson.Fragment(response.model_dump_json(exclude_none=True)),
+                    "message": "Message sent successfully"
+                }
         except Exception as e:
-            logger.error(f'Failed to send message: {e}')
+            logger.error('Failed to send message: %s', e)
             return {
                 "success": False,
                 "error": str(e)
             }
 
+    async def stream_message(self, agent_url: str, message_text: str) -> AsyncIterator[bytes]:
+        """Send a message to an A2A agent, yielding each response as JSON bytes as it arrives"""
+        client, supports_streaming = await self._get_client(agent_url)
+        params = self._build_message_params(message_text)
+        # JSON-RPC request id, distinct from the message_id inside params
+        request_id = uuid4().hex
+
+        if supports_streaming:
+            streaming_request = SendStreamingMessageRequest(
+                id=request_id,
+                params=params
+            )
+            async for chunk in client.send_message_streaming(streaming_request):
+                yield chunk.model_dump_json(exclude_none=True).encode()
+        else:
+            # Agent cannot stream, forward its single response
+            request = SendMessageRequest(
+                id=request_id,
+                params=params
+            )
+            response = await client.send_message(request)
+            yield response.model_dump_json(exclude_none=True).encode()
 
 # Global service instance
 inspector_service = A2AInspectorService()
@@ -0,0 +1,11 @@
+"""Gunicorn worker classes for the A2A Inspector"""
+
+from uvicorn_worker import UvicornWorker
+
+from .__main__ import HTTP, LOOP
+
+
+class InspectorUvicornWorker(UvicornWorker):
+    """Uvicorn worker pinned to the uvloop event loop and httptools HTTP parser, without access logs"""
+
+    CONFIG_KWARGS = {"loop": LOOP, "http": HTTP, "access_log": False}
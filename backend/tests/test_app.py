@@ -0,0 +1,190 @@
+"""Tests for the FastAPI application's error responses"""
+
+import orjson
+import pytest
+from a2a.types import AgentCard
+from fastapi.testclient import TestClient
+
+from a2a_inspector.main import app, inspector_service
+
+ORIGIN = "http://localhost:3000"
+
+CARD = AgentCard(
+    name="Echo",
+    description="echo agent",
+    url="http://agent.test/",
+    version="1.0.0",
+    capabilities={"streaming": False},
+    default_input_modes=["text"],
+    default_output_modes=["text"],
+    skills=[],
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def validate_url(url):
+        return None
+
+    monkeypatch.setattr(inspector_service, "validate_url", validate_url)
+    return TestClient(app)
+
+
+def test_unexpected_error_is_500_with_cors_headers(client, monkeypatch):
+    async def load_agent_card(agent_url):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(inspector_service, "load_agent_card", load_agent_card)
+
+    response = client.post("/api/v1/inspector/load", json={"url": "http://agent.test"}, headers={"Origin": ORIGIN})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "boom"}
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_agent_failure_is_502(client, monkeypatch):
+    async def load_agent_card(agent_url):
+        return {"success": False, "error": "agent unreachable"}
+
+    monkeypatch.setattr(inspector_service, "load_agent_card", load_agent_card)
+
+    response = client.post("/api/v1/inspector/load", json={"url": "http://agent.test"}, headers={"Origin": ORIGIN})
+
+    assert response.status_code == 502
+    assert response.json() == {"detail": "agent unreachable"}
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+@pytest.fixture
+def card(monkeypatch):
+    async def get_agent_card(agent_url):
+        return CARD
+
+    monkeypatch.setattr(inspector_service, "get_agent_card", get_agent_card)
+    # Drop results cached by earlier tests
+    inspector_service._inspection_cache.clear()
+    return CARD
+
+
+@pytest.mark.parametrize("path", ["/api/v1/inspector/load", "/api/v1/inspector/inspect", "/api/v1/inspector/load-and-inspect"])
+def test_card_etag(client, card, path):
+    response = client.post(path, json={"url": "http://agent.test"}, headers={"Origin": ORIGIN})
+
+    assert response.status_code == 200
+    assert "etag" not in response.json()
+    etag = response.headers["etag"]
+    assert "etag" in response.headers["access-control-expose-headers"].lower()
+
+    # A POST whose If-None-Match matches is a failed precondition, not a 304
+    response = client.post(path, json={"url": "http://agent.test"}, headers={"If-None-Match": etag})
+    assert response.status_code == 412
+    assert response.headers["etag"] == etag
+
+    response = client.post(path, json={"url": "http://agent.test"}, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+
+def test_inspect_and_load_and_inspect_match(client, card):
+    inspected = client.post("/api/v1/inspector/inspect", json={"url": "http://agent.test"})
+    combined = client.post("/api/v1/inspector/load-and-inspect", json={"url": "http://agent.test"})
+
+    assert inspected.json() == combined.json()
+    assert inspected.json()["validation"]
+
+
+def test_if_none_match_preflight_is_allowed(client):
+    response = client.options(
+        "/api/v1/inspector/inspect",
+        headers={
+            "Origin": ORIGIN,
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type, if-none-match",
+        },
+    )
+
+    assert response.status_code in (200, 204)
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_stream_lines_share_one_envelope(client, monkeypatch):
+    async def stream_message(agent_url, message_text):
+        yield b'{"jsonrpc":"2.0","id":"1","result":{"kind":"message"}}'
+        raise RuntimeError("agent went away")
+
+    monkeypatch.setattr(inspector_service, "stream_message", stream_message)
+
+    response = client.post("/api/v1/inspector/send-message/stream", json={"url": "http://agent.test", "message": "hi"})
+
+    assert response.status_code == 200
+    assert response.headers["x-accel-buffering"] == "no"
+    lines = [orjson.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"success": True, "data": {"jsonrpc": "2.0", "id": "1", "result": {"kind": "message"}}},
+        {"success": False, "error": "agent went away"},
+    ]
+
+
+def test_malformed_json_body(client):
+    response = client.post("/api/v1/inspector/load", content=b"{bad", headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("Invalid JSON body: ")
+    assert not response.json()["detail"].startswith("1:")
+
+
+def test_invalid_field_names_the_field(client):
+    response = client.post("/api/v1/inspector/send-message", json={"url": "http://agent.test", "message": ""})
+
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith("message: ")
+
+
+def test_delete_preflight_is_rejected(client):
+    response = client.options(
+        "/api/v1/inspector/inspect",
+        headers={"Origin": ORIGIN, "Access-Control-Request-Method": "DELETE"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_inspect_batch_keeps_input_order(client, monkeypatch):
+    async def validate_url(url):
+        return "Access to localhost is not allowed" if "localhost" in url else None
+
+    async def get_agent_card(agent_url):
+        if "down" in agent_url:
+            raise RuntimeError("agent unreachable")
+        return CARD
+
+    monkeypatch.setattr(inspector_service, "validate_url", validate_url)
+    monkeypatch.setattr(inspector_service, "get_agent_card", get_agent_card)
+
+    response = client.post(
+        "/api/v1/inspector/inspect-batch",
+        json={"urls": ["http://down.test", "http://localhost:8000", "http://agent.test"]},
+    )
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    results = response.json()["results"]
+    assert results[0] == {"success": False, "error": "agent unreachable"}
+    assert results[1] == {"success": False, "error": "Access to localhost is not allowed"}
+    assert results[2]["success"] is True
+    assert results[2]["data"]["name"] == "Echo"
+    assert results[2]["validation"]
+    assert all("etag" not in result for result in results)
+
+
+def test_unexpected_error_is_logged_with_traceback(client, monkeypatch, caplog):
+    async def load_agent_card(agent_url):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(inspector_service, "load_agent_card", load_agent_card)
+
+    client.post("/api/v1/inspector/load", json={"url": "http://agent.test"})
+
+    record = next(record for record in caplog.records if record.name == "a2a_inspector.middleware")
+    assert record.exc_info is not None
+    assert record.exc_info[0] is RuntimeError
@@ -0,0 +1,121 @@
+"""Tests for FastCORSMiddleware, checked against Starlette's CORSMiddleware"""
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from a2a_inspector.middleware import FastCORSMiddleware
+
+ALLOWED_ORIGIN = "http://localhost:3000"
+OTHER_ORIGIN = "http://evil.test"
+
+CORS_OPTIONS = dict(
+    allow_origins=[ALLOWED_ORIGIN],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "if-none-match"],
+    allow_credentials=True,
+    expose_headers=["ETag"],
+    max_age=600,
+)
+
+
+async def endpoint(request):
+    return PlainTextResponse("ok", headers={"Vary": "Accept-Encoding"})
+
+
+def make_client(middleware_class):
+    app = Starlette(
+        routes=[Route("/", endpoint, methods=["GET", "POST"])],
+        middleware=[Middleware(middleware_class, **CORS_OPTIONS)],
+    )
+    return TestClient(app)
+
+
+@pytest.fixture
+def fast():
+    return make_client(FastCORSMiddleware)
+
+
+@pytest.fixture
+def starlette():
+    return make_client(CORSMiddleware)
+
+
+def header_set(value):
+    return {item.strip().lower() for item in value.split(",")}
+
+
+PREFLIGHTS = {
+    "allowed": {"Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "Content-Type, If-None-Match"},
+    "allowed-no-headers": {"Access-Control-Request-Method": "GET"},
+    "safelisted-header": {"Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "accept-language"},
+    "bad-origin": {"Origin": OTHER_ORIGIN, "Access-Control-Request-Method": "POST"},
+    "bad-method": {"Access-Control-Request-Method": "PUT"},
+    "bad-header": {"Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "content-type, x-custom"},
+}
+
+
+@pytest.mark.parametrize("case", PREFLIGHTS)
+def test_preflight_matches_starlette(fast, starlette, case):
+    headers = {"Origin": ALLOWED_ORIGIN, **PREFLIGHTS[case]}
+    ours = fast.options("/", headers=headers)
+    theirs = starlette.options("/", headers=headers)
+
+    # Starlette answers an allowed preflight with 200 "OK", ours with an empty 204
+    assert ours.is_success == theirs.is_success
+    if not theirs.is_success:
+        assert ours.status_code == theirs.status_code == 400
+        assert ours.text == theirs.text
+        return
+
+    assert ours.headers["access-control-allow-origin"] == theirs.headers["access-control-allow-origin"]
+    assert ours.headers["access-control-allow-credentials"] == theirs.headers["access-control-allow-credentials"]
+    assert ours.headers["access-control-max-age"] == theirs.headers["access-control-max-age"]
+    assert header_set(ours.headers["access-control-allow-methods"]) == header_set(theirs.headers["access-control-allow-methods"])
+    assert header_set(ours.headers["access-control-allow-headers"]) == header_set(theirs.headers["access-control-allow-headers"])
+    assert {"origin", "access-control-request-method", "access-control-request-headers"} <= header_set(ours.headers["vary"])
+
+
+@pytest.mark.parametrize("origin", [ALLOWED_ORIGIN, OTHER_ORIGIN])
+def test_simple_request_matches_starlette(fast, starlette, origin):
+    ours = fast.get("/", headers={"Origin": origin})
+    theirs = starlette.get("/", headers={"Origin": origin})
+
+    assert ours.status_code == theirs.status_code == 200
+    assert ours.headers.get("access-control-allow-origin") == theirs.headers.get("access-control-allow-origin")
+    if origin == ALLOWED_ORIGIN:
+        # The endpoint's own Vary is kept and Origin is appended to it
+        assert ours.headers["vary"] == theirs.headers["vary"] == "Accept-Encoding, Origin"
+        assert ours.headers["access-control-allow-credentials"] == "true"
+        assert ours.headers["access-control-expose-headers"] == "ETag"
+
+
+def test_disallowed_origin_still_varies_on_origin(fast):
+    # Not compared with Starlette: older releases omit Vary for disallowed origins,
+    # which lets a shared cache serve this CORS-less response to an allowed origin
+    response = fast.get("/", headers={"Origin": OTHER_ORIGIN})
+
+    assert response.status_code == 200
+    assert response.headers["vary"] == "Accept-Encoding, Origin"
+    assert "access-control-allow-origin" not in response.headers
+    assert "access-control-allow-credentials" not in response.headers
+
+
+def test_request_without_origin_is_untouched(fast):
+    response = fast.get("/")
+
+    assert response.status_code == 200
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "access-control-allow-origin" not in response.headers
+
+
+def test_options_without_request_method_reaches_app(fast):
+    # Not a preflight: the route does not accept OPTIONS
+    response = fast.options("/", headers={"Origin": ALLOWED_ORIGIN})
+
+    assert response.status_code == 405
+    assert response.headers["access-control-allow-origin"] == ALLOWED_ORIGIN
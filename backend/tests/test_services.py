@@ -0,0 +1,138 @@
+"""Tests for A2AInspectorService caching and batch inspection"""
+
+import asyncio
+
+import pytest
+from a2a.types import AgentCard
+
+from a2a_inspector import services
+from a2a_inspector.services import A2AInspectorService
+
+
+class FakeResolver:
+    """Stands in for A2ACardResolver, counting fetches"""
+    calls = 0
+    result = None
+
+    def __init__(self, httpx_client, base_url):
+        self.base_url = base_url
+
+    async def get_agent_card(self):
+        FakeResolver.calls += 1
+        await asyncio.sleep(0.01)
+        if isinstance(FakeResolver.result, Exception):
+            raise FakeResolver.result
+        return FakeResolver.result
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    FakeResolver.calls = 0
+    FakeResolver.result = None
+    monkeypatch.setattr(services, "A2ACardResolver", FakeResolver)
+    return FakeResolver
+
+
+@pytest.mark.asyncio
+async def test_concurrent_card_fetches_are_shared(resolver):
+    resolver.result = card = object()
+    service = A2AInspectorService()
+
+    results = await asyncio.gather(*(service.get_agent_card("http://agent.test/") for _ in range(4)))
+
+    assert resolver.calls == 1
+    assert all(result is card for result in results)
+    assert await service.get_agent_card("http://agent.test/") is card
+    assert resolver.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_card_fetch_failure_is_shared(resolver):
+    resolver.result = RuntimeError("agent unreachable")
+    service = A2AInspectorService()
+
+    results = await asyncio.gather(
+        *(service.get_agent_card("http://agent.test/") for _ in range(4)), return_exceptions=True
+    )
+
+    assert resolver.calls == 1
+    assert all(result is resolver.result for result in results)
+    assert not service._card_fetches
+
+    # Failures are not cached, the next request fetches again
+    with pytest.raises(RuntimeError):
+        await service.get_agent_card("http://agent.test/")
+    assert resolver.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_fetch(resolver):
+    resolver.result = card = object()
+    service = A2AInspectorService()
+
+    first = asyncio.ensure_future(service.get_agent_card("http://agent.test/"))
+    second = asyncio.ensure_future(service.get_agent_card("http://agent.test/"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second is card
+    assert resolver.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_dns_failure_is_shared(monkeypatch):
+    calls = 0
+
+    async def getaddrinfo(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise services.socket.gaierror("Name or service not known")
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    service = A2AInspectorService()
+
+    results = await asyncio.gather(
+        *(service._resolve_hostname("agent.test") for _ in range(4)), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all(isinstance(result, services.socket.gaierror) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_inspect_agent_cards(monkeypatch):
+    card = AgentCard(
+        name="Echo",
+        description="echo agent",
+        url="http://agent.test/",
+        version="1.0.0",
+        capabilities={},
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        skills=[],
+    )
+    in_flight = max_in_flight = 0
+
+    async def get_agent_card(agent_url):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "down" in agent_url:
+            raise RuntimeError("agent unreachable")
+        return card
+
+    monkeypatch.setattr(services, "INSPECT_CONCURRENCY", 2)
+    service = A2AInspectorService()
+    monkeypatch.setattr(service, "get_agent_card", get_agent_card)
+    urls = [f"http://agent{i}.test/" for i in range(5)] + ["http://down.test/"]
+
+    results = await service.inspect_agent_cards(urls)
+
+    assert max_in_flight == 2
+    assert [result["success"] for result in results] == [True] * 5 + [False]
+    assert results[-1] == {"success": False, "error": "agent unreachable"}
+    assert all(result["data"]["name"] == "Echo" for result in results[:5])
+    assert all("etag" not in result for result in results)
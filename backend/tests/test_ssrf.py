@@ -0,0 +1,115 @@
+"""Tests for the SSRF blocked-range checks"""
+
+import ipaddress
+
+import pytest
+
+from a2a_inspector import services
+
+# Addresses in, next to and around the blocked ranges, including IPv6 addresses whose
+# leading bits look like a blocked IPv4 prefix
+ADDRESSES = [
+    "127.0.0.1", "10.1.2.3", "172.16.0.1", "172.32.0.1", "192.168.1.1", "192.169.0.1",
+    "169.254.169.254", "0.0.0.1", "224.0.0.1", "240.0.0.1", "255.255.255.255",
+    "8.8.8.8", "1.1.1.1", "93.184.215.14",
+    "::1", "::2", "fc00::1", "fd12:3456::1", "fe80::1", "febf::1", "fec0::1",
+    "2001:db8::1", "2606:4700::1111",
+    "64:ff9b::8.8.8.8", "a00::1", "7f00::1", "e000::1", "f000::1",
+    "::ffff:8.8.8.8", "::ffff:127.0.0.1", "::ffff:10.0.0.1",
+]
+
+BLOCKED = {
+    "127.0.0.1", "10.1.2.3", "172.16.0.1", "192.168.1.1", "169.254.169.254", "0.0.0.1",
+    "224.0.0.1", "240.0.0.1", "255.255.255.255",
+    "::1", "fc00::1", "fd12:3456::1", "fe80::1", "febf::1",
+    "::ffff:127.0.0.1", "::ffff:10.0.0.1",
+}
+
+
+@pytest.fixture(params=["trie", "scan"])
+def lookup(request, monkeypatch):
+    """Run a test against the pytricia lookup and against the pure-Python fallback"""
+    if request.param == "trie" and services._BLOCKED_TRIES is None:
+        pytest.skip("pytricia is not installed")
+    if request.param == "scan":
+        monkeypatch.setattr(services, "_BLOCKED_TRIES", None)
+    return request.param
+
+
+@pytest.mark.parametrize("address", ADDRESSES)
+def test_is_blocked_ip(lookup, address):
+    assert services._is_blocked_ip(ipaddress.ip_address(address)) is (address in BLOCKED)
+
+
+@pytest.mark.parametrize("address", ADDRESSES)
+def test_trie_matches_scan(address):
+    if services._BLOCKED_TRIES is None:
+        pytest.skip("pytricia is not installed")
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    assert (ip.packed in services._BLOCKED_TRIES[ip.version]) is services._scan_blocked_ranges(ip)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(services, "ALLOW_LOCAL_NETWORK", False)
+    return services.A2AInspectorService()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url, error", [
+    ("http://127.0.0.1:8000/", "Access to private/internal IP addresses is not allowed"),
+    ("http://169.254.169.254/latest/meta-data", "Access to private/internal IP addresses is not allowed"),
+    ("http://[::1]/", "Access to private/internal IP addresses is not allowed"),
+    ("http://[::ffff:127.0.0.1]/", "Access to private/internal IP addresses is not allowed"),
+    ("http://[fd00::1]/", "Access to private/internal IP addresses is not allowed"),
+    ("http://localhost/", "Access to localhost is not allowed"),
+    ("http://LOCALHOST:3000/", "Access to localhost is not allowed"),
+    ("http://agent.localhost/", "Access to localhost is not allowed"),
+    ("http://printer.local/", "Access to local network hostnames is not allowed"),
+    ("ftp://agent.test/", "URL must use http or https scheme"),
+    ("http:///card", "URL must include a hostname"),
+    ("http://8.8.8.8/", None),
+    ("http://[2606:4700::1111]/", None),
+])
+async def test_validate_url_literals_and_names(service, url, error):
+    # None of these may need a DNS lookup
+    async def getaddrinfo(*args, **kwargs):
+        raise AssertionError("unexpected DNS lookup")
+
+    service._lookup_hostname = getaddrinfo
+    assert await service.validate_url(url) == error
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("addresses, error", [
+    (("93.184.215.14",), None),
+    (("93.184.215.14", "10.0.0.5"), "Access to private/internal IP addresses is not allowed"),
+    (("2606:4700::1111", "fe80::1%2"), "Access to private/internal IP addresses is not allowed"),
+    (("64:ff9b::808:808",), None),
+])
+async def test_validate_url_checks_every_resolved_address(service, addresses, error):
+    async def lookup_hostname(hostname):
+        return addresses
+
+    service._lookup_hostname = lookup_hostname
+    assert await service.validate_url("https://agent.test/") == error
+
+
+@pytest.mark.asyncio
+async def test_validate_url_unresolvable(service):
+    async def lookup_hostname(hostname):
+        raise services.socket.gaierror("Name or service not known")
+
+    service._lookup_hostname = lookup_hostname
+    assert await service.validate_url("https://agent.test/") == "Unable to resolve hostname: agent.test"
+
+
+@pytest.mark.asyncio
+async def test_allow_local_network_skips_checks(monkeypatch):
+    monkeypatch.setattr(services, "ALLOW_LOCAL_NETWORK", True)
+    service = services.A2AInspectorService()
+
+    assert await service.validate_url("http://localhost:8000/") is None
+    assert await service.validate_url("ftp://localhost/") == "URL must use http or https scheme"